@@ -1,13 +1,47 @@
 """Unifi Protect Data."""
 import struct
+import time
 import zlib
-import datetime
 import logging
 import enum
+from functools import lru_cache
+
+# loads is re-exported for the websocket handler
+try:
+    # pylint: disable=no-name-in-module,unused-import
+    from orjson import loads  # noqa: F401
+except ImportError:
+    # pylint: disable=unused-import
+    from json import loads  # noqa: F401
 
 WS_HEADER_SIZE = 8
 _LOGGER = logging.getLogger(__name__)
 
+# Defaults for the fields process_event only changes for some events
+PROCESSED_EVENT_EMPTY = {
+    "event_on": False,
+    "event_ring_on": False,
+    "event_length": 0,
+}
+
+# Event fields that are only passed on when the event has them,
+# mapped to the key they are stored under
+_EVENT_OPTIONAL_KEYS = (
+    ("thumbnail", "event_thumbnail"),
+    ("heatmap", "event_heatmap"),
+)
+
+# The format of the frame header is
+# x: packet_type (skipped)
+# B: payload_format
+# b: deflated
+# x: unknown (skipped)
+# I: payload_size
+_WS_HEADER_STRUCT = struct.Struct("!xBbxI")
+_unpack_ws_header = _WS_HEADER_STRUCT.unpack_from
+# JSON payloads typically inflate to a few times their deflated size
+_WS_INFLATE_RATIO = 4
+
 
 @enum.unique
 class ProtectWSPayloadFormat(enum.Enum):
@@ -18,162 +52,142 @@ class ProtectWSPayloadFormat(enum.Enum):
     NodeBuffer = 3
 
 
+# Indexed by the payload format byte of the frame header, 0 is not a format
+_WS_PAYLOAD_FORMATS = (
+    None,
+    ProtectWSPayloadFormat.JSON,
+    ProtectWSPayloadFormat.UTF8String,
+    ProtectWSPayloadFormat.NodeBuffer,
+)
+
+
 def decode_ws_frame(frame, position):
     """Decode a unifi updates websocket frame."""
-    # The format of the frame is
-    # b: packet_type
-    # b: payload_format
-    # b: deflated
-    # b: unknown
-    # i: payload_size
-    _, payload_format, deflated, _, payload_size = struct.unpack(
-        "!bbbbi", frame[position : position + WS_HEADER_SIZE]
-    )
+    format_value, deflated, payload_size = _unpack_ws_header(frame, position)
+    try:
+        payload_format = _WS_PAYLOAD_FORMATS[format_value]
+    except IndexError:
+        payload_format = None
+    if payload_format is None:
+        raise ValueError(f"Unknown websocket payload format: {format_value}")
     position += WS_HEADER_SIZE
-    frame = frame[position : position + payload_size]
+    if position + payload_size > len(frame):
+        raise ValueError(
+            f"Websocket frame payload of {payload_size} bytes is truncated"
+        )
     if deflated:
-        frame = zlib.decompress(frame)
+        # Inflate straight from a view of the frame to avoid copying first
+        frame = zlib.decompress(
+            memoryview(frame)[position : position + payload_size],
+            bufsize=payload_size * _WS_INFLATE_RATIO,
+        )
+    else:
+        frame = frame[position : position + payload_size]
     position += payload_size
-    return frame, ProtectWSPayloadFormat(payload_format), position
+    return frame, payload_format, position
 
 
-def process_camera(server_id, host, camera):
-    """Process the camera json."""
-    # Get if camera is online
-    online = camera["state"] == "CONNECTED"
-    # Get Recording Mode
-    recording_mode = str(camera["recordingSettings"]["mode"])
-    # Get Infrared Mode
-    ir_mode = str(camera["ispSettings"]["irLedMode"])
-    # Get Status Light Setting
-    status_light = str(camera["ledSettings"]["isEnabled"])
-
-    # Get the last time motion occured
-    lastmotion = (
-        None
-        if camera["lastMotion"] is None
-        else datetime.datetime.fromtimestamp(int(camera["lastMotion"]) / 1000).strftime(
-            "%Y-%m-%d %H:%M:%S"
-        )
-    )
-    # Get the last time doorbell was ringing
-    lastring = (
-        None
-        if camera.get("lastRing") is None
-        else datetime.datetime.fromtimestamp(int(camera["lastRing"]) / 1000).strftime(
-            "%Y-%m-%d %H:%M:%S"
-        )
+@lru_cache(maxsize=4096)
+def _format_timestamp(seconds):
+    """Format a unix timestamp in seconds as local time."""
+    local = time.localtime(seconds)
+    return (
+        f"{local.tm_year:04d}-{local.tm_mon:02d}-{local.tm_mday:02d} "
+        f"{local.tm_hour:02d}:{local.tm_min:02d}:{local.tm_sec:02d}"
     )
-    # Get when the camera came online
-    upsince = (
-        "Offline"
-        if camera["upSince"] is None
-        else datetime.datetime.fromtimestamp(int(camera["upSince"]) / 1000).strftime(
-            "%Y-%m-%d %H:%M:%S"
-        )
-    )
-    # Check if Regular Camera or Doorbell
-    device_type = (
-        "camera" if "doorbell" not in str(camera["type"]).lower() else "doorbell"
-    )
-    # Get Firmware Version
-    firmware_version = str(camera["firmwareVersion"])
 
-    # Get High FPS Video Mode
+
+def _process_timestamp(ms):
+    """Format a unifi millisecond timestamp as local time."""
+    return _format_timestamp(int(ms) // 1000)
+
+
+def process_camera(server_id, host, camera):
+    """Process the camera json."""
+    model = camera["type"]
+    up_since = camera["upSince"]
+    last_motion = camera["lastMotion"]
+    last_ring = camera.get("lastRing")
     featureflags = camera.get("featureFlags")
-    has_highfps = "highFps" in featureflags.get("videoModes", "")
-    video_mode = camera.get("videoMode") or "default"
-    # Get HDR Mode
-    has_hdr = featureflags.get("hasHdr")
-    hdr_mode = camera.get("hdrMode") or False
 
     # Add rtsp streaming url if enabled
     rtsp = None
-    channels = camera["channels"]
-    for channel in channels:
+    for channel in camera["channels"]:
         if channel["isRtspEnabled"]:
             rtsp = f"rtsp://{host}:7447/{channel['rtspAlias']}"
             break
 
     return {
-        "name": str(camera["name"]),
-        "type": device_type,
-        "model": str(camera["type"]),
-        "mac": str(camera["mac"]),
+        "name": camera["name"],
+        # Check if Regular Camera or Doorbell
+        "type": "camera" if "doorbell" not in model.lower() else "doorbell",
+        "model": model,
+        "mac": camera["mac"],
         "ip_address": str(camera["host"]),
-        "firmware_version": firmware_version,
+        "firmware_version": str(camera["firmwareVersion"]),
         "server_id": server_id,
-        "recording_mode": recording_mode,
-        "ir_mode": ir_mode,
-        "status_light": status_light,
+        "recording_mode": str(camera["recordingSettings"]["mode"]),
+        "ir_mode": camera["ispSettings"]["irLedMode"],
+        "status_light": str(camera["ledSettings"]["isEnabled"]),
         "rtsp": rtsp,
-        "up_since": upsince,
-        "last_motion": lastmotion,
-        "last_ring": lastring,
-        "online": online,
-        "has_highfps": has_highfps,
-        "has_hdr": has_hdr,
-        "video_mode": video_mode,
-        "hdr_mode": hdr_mode,
+        # Get when the camera came online
+        "up_since": "Offline" if up_since is None else _process_timestamp(up_since),
+        # Get the last time motion occured
+        "last_motion": (
+            None if last_motion is None else _process_timestamp(last_motion)
+        ),
+        # Get the last time doorbell was ringing
+        "last_ring": None if last_ring is None else _process_timestamp(last_ring),
+        "online": camera["state"] == "CONNECTED",
+        "has_highfps": "highFps" in featureflags.get("videoModes", ""),
+        "has_hdr": featureflags.get("hasHdr"),
+        "video_mode": camera.get("videoMode") or "default",
+        "hdr_mode": camera.get("hdrMode") or False,
     }
 
 
 def process_event(event, minimum_score, event_ring_check_converted):
     """Convert an event to our format."""
     event_type = event["type"]
-    event_on = False
-    event_ring_on = False
-    event_length = 0
-    event_objects = None
-    processed_event = {}
-
-    if event["start"]:
-        start_time = datetime.datetime.fromtimestamp(
-            int(event["start"]) / 1000
-        ).strftime("%Y-%m-%d %H:%M:%S")
-        event_length = 0
+    start = event["start"]
+    end = event["end"]
+    score = event["score"]
+    if start:
+        start_time = _process_timestamp(start)
     else:
         start_time = None
+
+    processed_event = PROCESSED_EVENT_EMPTY.copy()
+
     if event_type in ("motion", "smartDetectZone"):
-        if event["end"]:
-            event_on = False
-            event_length = (float(event["end"]) / 1000) - (float(event["start"]) / 1000)
+        if end:
+            processed_event["event_length"] = (end - start) / 1000
             if event_type == "smartDetectZone":
-                event_objects = event["smartDetectTypes"]
-        else:
-            if int(event["score"]) >= minimum_score:
-                event_on = True
-                if event_type == "smartDetectZone":
-                    event_objects = event["smartDetectTypes"]
-            else:
-                event_on = False
+                processed_event["event_object"] = event["smartDetectTypes"]
+        elif int(score) >= minimum_score:
+            processed_event["event_on"] = True
+            if event_type == "smartDetectZone":
+                processed_event["event_object"] = event["smartDetectTypes"]
         processed_event["last_motion"] = start_time
     else:
         processed_event["last_ring"] = start_time
-        if event["end"]:
-            if (
-                event["start"] >= event_ring_check_converted
-                and event["end"] >= event_ring_check_converted
-            ):
+        if end:
+            # An event ends after it starts, so checking the start is enough
+            if start >= event_ring_check_converted:
                 _LOGGER.debug("EVENT: DOORBELL HAS RUNG IN LAST 3 SECONDS!")
-                event_ring_on = True
+                processed_event["event_ring_on"] = True
             else:
                 _LOGGER.debug("EVENT: DOORBELL WAS NOT RUNG IN LAST 3 SECONDS")
-                event_ring_on = False
         else:
             _LOGGER.debug("EVENT: DOORBELL IS RINGING")
-            event_ring_on = True
+            processed_event["event_ring_on"] = True
 
     processed_event["event_start"] = start_time
-    processed_event["event_score"] = event["score"]
-    processed_event["event_on"] = event_on
-    processed_event["event_ring_on"] = event_ring_on
+    processed_event["event_score"] = score
     processed_event["event_type"] = event_type
-    processed_event["event_length"] = event_length
-    if event_objects is not None:
-        processed_event["event_object"] = event_objects
-    if event["thumbnail"] is not None:  # Only update if there is a new Motion Event
-        processed_event["event_thumbnail"] = event["thumbnail"]
-    if event["heatmap"] is not None:  # Only update if there is a new Motion Event
-        processed_event["event_heatmap"] = event["heatmap"]
+    # Only update if there is a new Motion Event
+    for key, processed_key in _EVENT_OPTIONAL_KEYS:
+        value = event[key]
+        if value is not None:
+            processed_event[processed_key] = value
     return processed_event
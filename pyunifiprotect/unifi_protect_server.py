@@ -2,7 +2,6 @@
 
 import asyncio
 import datetime
-import json as pjson
 import logging
 import time
 
@@ -13,12 +12,15 @@ from .unifi_data import (
     process_camera,
     process_event,
     decode_ws_frame,
+    loads,
     ProtectWSPayloadFormat,
 )
 
 CAMERA_UPDATE_INTERVAL_SECONDS = 60
 WEBSOCKET_CHECK_INTERVAL_SECONDS = 120
 
+PROCESSED_EVENT_TYPES = frozenset(("motion", "ring", "smartDetectZone"))
+
 EMPTY_EVENT = {
     "event_start": None,
     "event_score": 0,
@@ -326,15 +328,12 @@ class UpvServer:  # pylint: disable=too-many-public-methods, too-many-instance-a
 
         await self.ensure_authenticated()
 
-        event_start = datetime.datetime.now() - datetime.timedelta(seconds=lookback)
-        event_end = datetime.datetime.now() + datetime.timedelta(seconds=10)
-        start_time = int(time.mktime(event_start.timetuple())) * 1000
-        end_time = int(time.mktime(event_end.timetuple())) * 1000
-
-        event_ring_check = datetime.datetime.now() - datetime.timedelta(seconds=3)
-        event_ring_check_converted = (
-            int(time.mktime(event_ring_check.timetuple())) * 1000
-        )
+        # Read the clock once and share it between the request window
+        # and the ring check of every event in the response
+        now = int(time.time())
+        start_time = (now - lookback) * 1000
+        end_time = (now + 10) * 1000
+        event_ring_check_converted = (now - 3) * 1000
         event_uri = f"{self._base_url}/{self.api_path}/events"
         params = {
             "end": str(end_time),
@@ -354,19 +353,21 @@ class UpvServer:  # pylint: disable=too-many-public-methods, too-many-instance-a
             )
 
         updated = {}
+        minimum_score = self._minimum_score
+        device_data = self.device_data
         for event in await response.json():
-            if event["type"] not in ("motion", "ring", "smartDetectZone"):
+            if event["type"] not in PROCESSED_EVENT_TYPES:
                 continue
 
             proccessed_event = process_event(
-                event, self._minimum_score, event_ring_check_converted
+                event, minimum_score, event_ring_check_converted
             )
 
             camera_id = event["camera"]
+            camera_data = device_data[camera_id]
+            camera_data.update(proccessed_event)
 
-            self.device_data[camera_id].update(proccessed_event)
-
-            updated[camera_id] = self.device_data[camera_id]
+            updated[camera_id] = camera_data
 
         return updated
 
@@ -780,12 +781,13 @@ class UpvServer:  # pylint: disable=too-many-public-methods, too-many-instance-a
         if action_frame_payload_format != ProtectWSPayloadFormat.JSON:
             return
 
-        action_json = pjson.loads(action_frame)
+        action_json = loads(action_frame)
         _LOGGER.debug("Action Frame: %s", action_json)
 
+        # Most frames are updates to other models, so check the model first
         if (
-            action_json.get("action") != "update"
-            or action_json.get("modelKey") != "camera"
+            action_json.get("modelKey") != "camera"
+            or action_json.get("action") != "update"
         ):
             return
 
@@ -800,7 +802,7 @@ class UpvServer:  # pylint: disable=too-many-public-methods, too-many-instance-a
         if data_frame_payload_format != ProtectWSPayloadFormat.JSON:
             return
 
-        data_json = pjson.loads(data_frame)
+        data_json = loads(data_frame)
         _LOGGER.debug("Data Frame: %s", data_json)
 
         last_motion = data_json.get("lastMotion")
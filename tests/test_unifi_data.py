@@ -0,0 +1,71 @@
+"""Tests for the Unifi Protect data helpers."""
+
+import struct
+import zlib
+
+import pytest
+
+from pyunifiprotect.unifi_data import (
+    ProtectWSPayloadFormat,
+    decode_ws_frame,
+    process_camera,
+)
+
+
+def _ws_frame(payload, payload_format=1, deflated=False):
+    if deflated:
+        payload = zlib.compress(payload)
+    return struct.pack("!bbbbi", 1, payload_format, deflated, 0, len(payload)) + payload
+
+
+def test_decode_ws_frame():
+    action_frame = _ws_frame(b'{"action": "update"}')
+    message = action_frame + _ws_frame(b'{"lastMotion": 1}', deflated=True)
+    frame, payload_format, position = decode_ws_frame(message, 0)
+    assert frame == b'{"action": "update"}'
+    assert payload_format == ProtectWSPayloadFormat.JSON
+    assert position == len(action_frame)
+    frame, payload_format, position = decode_ws_frame(message, position)
+    assert frame == b'{"lastMotion": 1}'
+    assert payload_format == ProtectWSPayloadFormat.JSON
+    assert position == len(message)
+
+
+@pytest.mark.parametrize("payload_size", [-8, -1, 1])
+def test_decode_ws_frame_bad_payload_size(payload_size):
+    message = struct.pack("!bbbbi", 1, 1, 0, 0, payload_size)
+    with pytest.raises(ValueError):
+        decode_ws_frame(message, 0)
+
+
+def test_decode_ws_frame_truncated():
+    with pytest.raises(ValueError):
+        decode_ws_frame(_ws_frame(b"payload")[:-1], 0)
+
+
+@pytest.mark.parametrize("payload_format", [0, 4, 255])
+def test_decode_ws_frame_unknown_format(payload_format):
+    frame = struct.pack("!bBbbi", 1, payload_format, 0, 0, 0)
+    with pytest.raises(ValueError):
+        decode_ws_frame(frame, 0)
+
+
+def test_process_camera_missing_host_and_firmware():
+    camera = {
+        "name": "Front Door",
+        "type": "UVC G4 Doorbell",
+        "mac": "AABBCCDDEEFF",
+        "host": None,
+        "firmwareVersion": None,
+        "state": "DISCONNECTED",
+        "recordingSettings": {"mode": "always"},
+        "ispSettings": {"irLedMode": "auto"},
+        "ledSettings": {"isEnabled": True},
+        "upSince": None,
+        "lastMotion": None,
+        "featureFlags": {"videoModes": ["default"], "hasHdr": False},
+        "channels": [],
+    }
+    processed = process_camera("server", "host", camera)
+    assert processed["ip_address"] == "None"
+    assert processed["firmware_version"] == "None"